@@ -3,11 +3,14 @@
 중국 로봇·AI 뉴스 자동 클리핑 (날짜 완화 + 리서치 요약)
 """
 
-import os, re, json, hashlib, pathlib, yaml, requests, feedparser
+import os, re, json, time, socket, hashlib, pathlib, threading, functools, itertools, operator, email.utils, yaml, requests, feedparser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
+from html import escape, unescape
+from urllib.parse import urlparse
+from urllib.request import getproxies
 from zoneinfo import ZoneInfo
-from lxml import html as lhtml
-from jinja2 import Template
+from lxml import etree, html as lhtml
 from requests.adapters import HTTPAdapter, Retry
 
 try:
@@ -15,14 +18,68 @@ try:
 except Exception:
     trafilatura = None
 
+try:  # 발췌 추출은 resiliparse(빠름) 우선, 없으면 trafilatura
+    from resiliparse.parse.html import HTMLTree
+    from resiliparse.parse.encoding import detect_encoding
+    from resiliparse.extract.html2text import extract_plain_text
+except Exception:
+    HTMLTree = None
+
+try:
+    import requests_cache
+except Exception:
+    requests_cache = None
+
+try:
+    from dateutil import parser as dtparser
+except Exception:
+    dtparser = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import xxhash
+except Exception:
+    xxhash = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except Exception:
+    LexborHTMLParser = None
+
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DOCS = ROOT / "docs"
+CACHE_DIR = ROOT / ".cache"  # 실행 간 유지되는 캐시 (Pages 산출물과 분리)
 
 # ===== 설정 =====
 LOCAL_TZ = ZoneInfo(os.environ.get("LOCAL_TZ", "Asia/Seoul"))
 WINDOW_HOURS = int(os.environ.get("WINDOW_HOURS", "72"))  # 기본 72h
 SKIP_HTML = os.environ.get("SKIP_HTML", "0") == "1"
 EXTRACT_BODY = os.environ.get("EXTRACT_BODY", "1") == "1"
+FEED_WORKERS = int(os.environ.get("FEED_WORKERS", "16"))     # 소스 단위 동시 수집
+DETAIL_WORKERS = int(os.environ.get("DETAIL_WORKERS", "8"))  # 상세 페이지 동시 요청(전체 호스트 합계)
+PER_HOST = int(os.environ.get("PER_HOST", "4"))              # 같은 호스트에 대한 동시 요청 상한 (RSS/목록/상세 공통)
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(os.cpu_count() or 1)))  # RSS 파싱 프로세스 수, 0이면 스레드에서 직접
+SIMHASH_K = int(os.environ.get("SIMHASH_K", "3"))            # 제목+요약 SimHash 해밍 거리 ≤K 이면 중복
+HTTP_CACHE = os.environ.get("HTTP_CACHE", "1") == "1"
+CACHE_TTL = int(os.environ.get("CACHE_TTL", "3600"))  # 초. 만료 후엔 ETag/Last-Modified로 재검증(304)
+MAX_FEED_BYTES = int(os.environ.get("MAX_FEED_BYTES", str(5 << 20)))  # RSS 한 건 최대 크기
+CACHE_DAYS = int(os.environ.get("CACHE_DAYS", "7"))   # 이 기간 동안 다시 보이지 않은 캐시 항목은 정리
+# (연결, 읽기) 초 — 죽은 호스트는 연결 단계에서 빨리 포기. 상세 페이지는 읽기도 짧게
+CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = (CONNECT_TIMEOUT, float(os.environ.get("READ_TIMEOUT", "20")))
+DETAIL_TIMEOUT = (CONNECT_TIMEOUT, float(os.environ.get("DETAIL_READ_TIMEOUT", "10")))
+DETAIL_DEADLINE = float(os.environ.get("DETAIL_DEADLINE", "20"))  # 상세 페이지 한 건 다운로드 전체 상한(초)
+MAX_PAGE_BYTES = int(os.environ.get("MAX_PAGE_BYTES", str(5 << 20)))  # 상세 페이지 한 건 최대 크기
+EXTRACT_BUDGET = float(os.environ.get("EXTRACT_BUDGET", "120"))  # 실행 전체에서 본문 추출에 쓸 시간 합계 상한(초)
 
 # ===== 템플릿 =====
 TEMPLATE = """<!doctype html><meta charset="utf-8">
@@ -58,10 +115,17 @@ function r(x){el.innerHTML=x.map(i=>`<div class=item>
 </div>`).join('');}
 function f(q){q=q.toLowerCase();r(data.filter(i=>(i.title+i.summary+i.source).toLowerCase().includes(q)))} r(data);
 </script>"""
+_TPL_VAR_RX = re.compile(r"\{\{(\w+)\}\}")  # 템플릿 문법은 {{이름}} 치환뿐이라 Jinja 파싱·컴파일 없이 정규식 한 번으로
+def render(tpl: str, **ctx) -> str: return _TPL_VAR_RX.sub(lambda m: str(ctx[m.group(1)]), tpl)
 
 # ===== HTTP 세션 =====
-def build_session():
-    s = requests.Session()
+def build_session(cached=HTTP_CACHE):
+    if cached and requests_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        s = requests_cache.CachedSession(str(CACHE_DIR/"http"), backend="sqlite",
+                                         expire_after=CACHE_TTL, allowable_methods=("GET",))
+    else:
+        s = requests.Session()
     retries = Retry(total=2, backoff_factor=0.6,
                     status_forcelist=[429,500,502,503,504],
                     allowed_methods=["GET","HEAD","OPTIONS"])
@@ -69,158 +133,620 @@ def build_session():
         "User-Agent": "Mozilla/5.0 (compatible; RLWRLD-NewsBot/1.0; +https://github.com/)",
         "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,ko;q=0.7",
     })
-    s.mount("http://", HTTPAdapter(max_retries=retries))
-    s.mount("https://", HTTPAdapter(max_retries=retries))
+    # 호스트별 keep-alive 연결을 PER_HOST개까지 유지, 호스트 풀은 LRU로 밀려나지 않게 넉넉히
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=64, pool_maxsize=PER_HOST)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
     return s
 
-SESSION = build_session()
-def http_get(url, timeout=20): return SESSION.get(url, timeout=timeout)
+SESSION = build_session()  # requests.Session은 스레드 간 .get() 공유 가능
+# 피드·상세 페이지는 캐시 없는 세션으로 스트리밍 — CachedSession은 저장하려고 본문을 끝까지 받으므로
+# 크기·시간 상한이 무의미해짐. 피드 재검증(304)은 FEED_CACHE, 상세 페이지 재방문은 ARTICLE_CACHE로 대신
+STREAM_SESSION = build_session(cached=False) if hasattr(SESSION, "cache") else SESSION
+def http_get(url, timeout=HTTP_TIMEOUT, **kw): return SESSION.get(url, timeout=timeout, **kw)
+
+def read_capped(r, cap: int, deadline: float | None = None) -> bytes:
+    """stream=True 응답을 청크로 읽되 cap 바이트를 넘거나 deadline(time.monotonic 기준)이 지나면 중단
+    읽기 타임아웃은 recv 한 번마다라, 조금씩 흘려 보내는 서버는 deadline으로만 끊을 수 있음"""
+    n = int(r.headers.get("Content-Length") or 0)
+    if n > cap: raise ValueError(f"too large ({n} bytes)")
+    buf = bytearray()
+    read1 = getattr(r.raw, "read1", None)  # urllib3 2.x: 도착한 만큼 바로 반환 — 64KB가 찰 때까지 막히지 않음
+    chunks = iter(lambda: read1(64 << 10, decode_content=True), b"") if read1 else r.iter_content(64 << 10)
+    for chunk in chunks:
+        buf += chunk
+        if len(buf) > cap: raise ValueError(f"too large (>{cap} bytes)")
+        if deadline and time.monotonic() > deadline: raise TimeoutError(f"download too slow ({len(buf)} bytes before deadline)")
+    return bytes(buf)
+
+# ===== 동시성 =====
+DETAIL_POOL = ThreadPoolExecutor(max_workers=DETAIL_WORKERS)
+# feedparser는 순수 파이썬이라 GIL을 잡고 있음 — 여러 피드를 코어별로 병렬 파싱
+PARSE_POOL = ProcessPoolExecutor(max_workers=PARSE_WORKERS) if PARSE_WORKERS > 0 else None
+_HOST_SEMS, _HOST_LOCK = {}, threading.Lock()
+
+_CLAIM_LOCK = threading.Lock()
+def claim(claimed: set, key) -> bool:
+    """여러 스레드가 공유하는 set에 key를 처음 넣는 쪽만 True"""
+    with _CLAIM_LOCK:
+        if key in claimed: return False
+        claimed.add(key); return True
+
+_DNS_GONE = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}  # 이름 자체가 없음(확정)
+
+def resolve_hosts(urls) -> set:
+    """소스 호스트 DNS를 병렬로 미리 조회(OS 리졸버 캐시 예열) — 존재하지 않는 것으로 확정된 호스트 집합 반환
+    EAI_AGAIN·타임아웃 같은 일시 오류는 실패로 치지 않고 평소대로 요청(urllib3 재시도)에 맡김"""
+    hosts = sorted({urlparse(u).hostname for u in urls} - {None})
+    def gone(h):
+        for attempt in range(2):  # 확정 실패도 한 번은 다시 물어봄
+            try: socket.getaddrinfo(h, None, type=socket.SOCK_STREAM); return False
+            except socket.gaierror as ex:
+                if ex.errno not in _DNS_GONE: return False
+            except OSError: return False
+            if not attempt: time.sleep(1)
+        return True
+    with ThreadPoolExecutor(max_workers=FEED_WORKERS) as ex:
+        bad = {h for h, g in zip(hosts, ex.map(gone, hosts)) if g}
+    return set() if getproxies() else bad  # 프록시 경유면 로컬 DNS 실패는 의미 없음
+
+def host_slot(url):
+    """호스트별 세마포어 — 한 출처에 요청이 몰리지 않도록 제한"""
+    host = urlparse(url).netloc
+    with _HOST_LOCK:
+        sem = _HOST_SEMS.get(host)
+        if sem is None: sem = _HOST_SEMS[host] = threading.BoundedSemaphore(PER_HOST)
+    return sem
 
 # ===== 유틸 =====
-def load_yaml(path): return yaml.safe_load(open(path, 'r', encoding='utf-8'))
-def sha(s): return hashlib.sha1(s.encode('utf-8')).hexdigest()
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml C 바인딩이 있으면 사용
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path, mtime): return yaml.load(pathlib.Path(path).read_bytes(), Loader=_YAML_LOADER)
+def load_yaml(path): return _load_yaml(str(path), os.path.getmtime(path))  # 파일이 바뀌면 다시 파싱
+def _utf8(s): return s if isinstance(s, bytes) else s.encode('utf-8')
+if xxhash:  # 캐시 키 용도라 암호학적 해시가 필요 없음
+    def sha(s): return xxhash.xxh64_hexdigest(_utf8(s))
+else:
+    def sha(s): return hashlib.blake2b(_utf8(s), digest_size=8).hexdigest()
+def dump_json(obj) -> bytes:
+    if orjson: return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+def write_if_changed(path: pathlib.Path, *chunks: bytes) -> bool:
+    """내용이 같으면 쓰지 않음(mtime 유지). 다르면 임시 파일에 조각별로 쓴 뒤 os.replace로 원자적 교체
+    chunks: 큰 페이로드를 합친 사본을 만들지 않도록 조각 그대로 비교·기록 (크기가 다르면 읽지도 않음)"""
+    try:
+        if path.stat().st_size == sum(map(len, chunks)):
+            with path.open("rb") as f:
+                if all(f.read(len(c)) == c for c in chunks): return False
+    except FileNotFoundError: pass
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            for c in chunks: f.write(c)
+        os.replace(tmp, path)
+    except BaseException:  # 실패한 실행이 docs/에 .tmp를 남겨 커밋되지 않게
+        try: os.unlink(tmp)
+        except FileNotFoundError: pass
+        raise
+    return True
+def load_json(path, default):
+    try: return json.loads(pathlib.Path(path).read_text("utf-8"))
+    except Exception: return default
 def now_utc(): return datetime.now(timezone.utc)
 def now_utc_iso(): return now_utc().isoformat(timespec="seconds")
 
+@functools.lru_cache(maxsize=256)
+def _compile(pat, flags=re.I): return re.compile(pat, flags)
+
+def compile_patterns(patterns):
+    """키워드 정규식 목록 → 하나의 alternation 패턴 (목록이 비면 None)"""
+    if not patterns: return None
+    return _compile("|".join(f"(?:{p})" for p in patterns))
+
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+def _literal_words(p: str):
+    """리터럴이면 [p], '(a|b|c)' 처럼 리터럴만 나열한 그룹이면 [a,b,c], 진짜 정규식이면 None"""
+    if not _REGEX_META.search(p): return [p]
+    if p.startswith("(") and p.endswith(")") and not p.startswith("(?"):
+        words = p[1:-1].split("|")
+        if all(w and not _REGEX_META.search(w) for w in words): return words
+    return None
+
+@functools.lru_cache(maxsize=8)
+def compile_keywords(patterns: tuple):
+    """키워드 목록 → text 가 하나라도 맞으면 True 인 함수 (목록이 비면 None).
+    리터럴은 Aho-Corasick 자동자 한 번 순회로, 나머지 정규식은 하나의 alternation으로.
+    같은 목록이면 main()을 다시 불러도 만들어 둔 매처를 재사용"""
+    if not patterns: return None
+    words, regexes = [], []
+    for p in patterns:
+        lit = _literal_words(p) if ahocorasick else None
+        if lit: words += lit
+        else: regexes.append(p)
+    rx = compile_patterns(regexes)
+    if not words: return lambda text: bool(rx.search(text))
+    A = ahocorasick.Automaton()
+    for w in words: A.add_word(w.lower(), w)
+    A.make_automaton()
+    def match(text: str) -> bool:
+        for _ in A.iter(text.lower()): return True
+        return bool(rx and rx.search(text))
+    return match
+
+# ===== 유사 중복(SimHash) =====
+_TOKEN_RX = re.compile(r"[0-9a-z]+|[^\W0-9a-z_]")  # 영숫자 단어 / 한자 등은 글자 단위
+_SIM_BANDS = SIMHASH_K + 1          # 비둘기집: 거리 ≤K 면 K+1 블록 중 하나는 일치
+_SIM_WIDTH = 64 // _SIM_BANDS
+
+_SIM_CHARS = 240   # 제목 + 요약 앞부분이면 같은 기사 판별에 충분
+_SIM_LANE = 16     # 비트별 카운터 폭 — 토큰 65535개까지
+# 바이트 k의 값 b → 비트마다 16비트 칸 하나씩 펼친 정수. 해시 하나를 8번 조회·덧셈으로 64개 카운터에 한꺼번에 더함
+_SIM_SPREAD = [[sum(((b >> j) & 1) << ((k*8 + j) * _SIM_LANE) for j in range(8)) for b in range(256)]
+               for k in range(8)]
+if xxhash:
+    def _gram_digest(g): return xxhash.xxh64_digest(g.encode('utf-8'))
+else:
+    def _gram_digest(g): return hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest()
+
+def simhash(text: str):
+    toks = _TOKEN_RX.findall(text[:_SIM_CHARS].lower())
+    grams = [a+b for a,b in zip(toks, toks[1:])] or toks
+    if not grams: return None
+    S0,S1,S2,S3,S4,S5,S6,S7 = _SIM_SPREAD
+    acc = 0
+    for g in grams:
+        d = _gram_digest(g)
+        acc += S0[d[7]]+S1[d[6]]+S2[d[5]]+S3[d[4]]+S4[d[3]]+S5[d[2]]+S6[d[1]]+S7[d[0]]
+    n, m = len(grams), (1 << _SIM_LANE) - 1
+    return sum(1 << i for i in range(64) if 2*((acc >> (i*_SIM_LANE)) & m) > n)  # 1이 과반인 비트
+
+def _sim_blocks(h):
+    mask = (1 << _SIM_WIDTH) - 1
+    return [(h >> (i*_SIM_WIDTH)) & mask for i in range(_SIM_BANDS)]
+
+def near_dup(index, h) -> bool:
+    """index: 밴드별 {블록값: [해시]} — 이미 비슷한 해시가 있으면 True, 없으면 등록"""
+    blocks = _sim_blocks(h)
+    for band, b in zip(index, blocks):
+        for other in band.get(b, ()):
+            if (h ^ other).bit_count() <= SIMHASH_K: return True
+    for band, b in zip(index, blocks): band.setdefault(b, []).append(h)
+    return False
+
 # ===== 시간 윈도우 =====
 def window_bounds():
     end_local = datetime.now(LOCAL_TZ)
     start_local = end_local - timedelta(hours=WINDOW_HOURS)
     return start_local, end_local
 WIN_START_LOCAL, WIN_END_LOCAL = window_bounds()
+# 비교는 POSIX 초로 — 기사마다 astimezone()으로 tz 변환하지 않음
+WIN_START_TS, WIN_END_TS = WIN_START_LOCAL.timestamp(), WIN_END_LOCAL.timestamp()
 
 def in_window(dt_aware: datetime | None) -> bool:
     if not dt_aware: return True  # 날짜 없으면 그냥 통과
-    dt_local = dt_aware.astimezone(LOCAL_TZ)
-    return WIN_START_LOCAL <= dt_local <= WIN_END_LOCAL
+    return WIN_START_TS <= dt_aware.timestamp() <= WIN_END_TS
 
 def parse_dt_any(s: str | None):
     if not s: return None
+    s = s.strip()
     try:
-        from dateutil import parser as dtparser
-        d = dtparser.parse(s)
-        if d.tzinfo is None: d = d.replace(tzinfo=timezone.utc)
-        return d.astimezone(timezone.utc)
-    except: return None
+        d = datetime.fromisoformat(s)  # 대부분 ISO-8601 (3.11부터 'Z' 포함)
+    except ValueError:
+        if not dtparser: return None
+        try: d = dtparser.parse(s)     # 그 외 형식만 느린 관용 파서로
+        except Exception: return None
+    if d.tzinfo is None: d = d.replace(tzinfo=timezone.utc)
+    return d.astimezone(timezone.utc)
+
+# 발행시각 후보 (우선순위 순서). <time datetime>은 마지막 순위
+_META_KEYS = (
+    ("property", "article:published_time"),
+    ("name", "article:published_time"),
+    ("itemprop", "datePublished"),
+    ("name", "pubdate"),
+    ("property", "og:updated_time"),
+)
+# 한 번의 트리 순회로 모든 후보 요소를 수집 (모듈 로드 시 한 번만 컴파일)
+_PUBDATE_XP = etree.XPath("//*[self::meta[@content][{}] or self::time[@datetime]]".format(
+    " or ".join(f"@{a}='{v}'" for a, v in _META_KEYS)))
+
+def _pubdate_rank(el):
+    if el.tag == "time": return len(_META_KEYS), el.get("datetime")
+    for i, (a, v) in enumerate(_META_KEYS):
+        if el.get(a) == v: return i, el.get("content")
 
-def extract_published_from_html(html_text: str):
+# lxml 없이 원시 바이트에서 바로 찾는 빠른 경로 (속성 순서 무관)
+_META_SNIFF_RX = re.compile(
+    rb"<meta\b[^>]*?(?<![\w-])(?:property|name|itemprop)\s*=\s*[\"']?"
+    rb"(article:published_time|datePublished|pubdate|og:updated_time)(?=[\"'\s/>])[^>]*>", re.I)
+# 속성 이름 앞은 (?<![\w-]) — \b는 하이픈 뒤에서도 맞아 data-name=·data-content= 를 진짜 속성으로 읽음
+# 키 뒤 구분자는 전방탐색 — 태그의 '>'를 먹으면 다음 태그까지 번짐
+_CONTENT_RX = re.compile(rb"(?<![\w-])content\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))", re.I)
+_TIME_SNIFF_RX = re.compile(rb"<time\b[^>]*?(?<![\w-])datetime\s*=\s*[\"']?([^\"'\s>]+)", re.I)
+_SNIFF_RANK = {b"article:published_time": 0, b"datepublished": 2, b"pubdate": 3, b"og:updated_time": 4}
+
+def sniff_published(raw: bytes):
+    cands = []
+    for m in _META_SNIFF_RX.finditer(raw):
+        c = _CONTENT_RX.search(m.group(0))
+        if c: cands.append((_SNIFF_RANK[m.group(1).lower()], c.group(c.lastindex)))
+    m = _TIME_SNIFF_RX.search(raw)
+    if m: cands.append((len(_META_KEYS), m.group(1)))
+    for _, val in sorted(cands, key=lambda x: x[0]):
+        dt = parse_dt_any(val.decode("ascii", "ignore"))
+        if dt: return dt
+    return None
+
+def extract_published_from_html(raw: bytes):
+    dt = sniff_published(raw)
+    if dt: return dt
     try:
-        doc = lhtml.fromstring(html_text)
-        meta_xpaths = [
-            "//meta[@property='article:published_time']/@content",
-            "//meta[@name='article:published_time']/@content",
-            "//meta[@itemprop='datePublished']/@content",
-            "//meta[@name='pubdate']/@content",
-            "//meta[@property='og:updated_time']/@content",
-            "//time[@datetime]/@datetime",
-        ]
-        for xp in meta_xpaths:
-            vals = doc.xpath(xp)
-            if vals:
-                dt = parse_dt_any(vals[0])
-                if dt: return dt
+        # 정규식이 놓친 경우만 <head> 부분을 lxml로 (본문 DOM은 만들지 않음)
+        head = re.split(rb"</head\s*>", raw, maxsplit=1, flags=re.I)[0]
+        doc = lhtml.fromstring(head)
+        for _, val in sorted(map(_pubdate_rank, _PUBDATE_XP(doc)), key=lambda x: x[0]):
+            dt = parse_dt_any(val)
+            if dt: return dt
     except: return None
     return None
 
+_SPACES = str.maketrans({"\u3000": " ", "\xa0": " "})  # 전각 공백·NBSP를 C 수준 한 번의 순회로
 def clean_text(s: str) -> str:
-    return (s or "").strip().replace("\u3000"," ").replace("\xa0"," ")
+    return (s or "").translate(_SPACES).strip()
+
+# 상세 페이지 기록: sha(href) -> {"pub": 발행시각 ISO, "seen": 마지막으로 목록에서 본 epoch, "sum": 본문 요약}
+# 창 밖으로 확인된 기사는 다음 실행부터 요청 생략, 창 안 기사는 저장된 요약으로 바로 항목 생성
+ARTICLE_CACHE = load_json(CACHE_DIR/"articles.json", {})
+RUN_TS = int(now_utc().timestamp())
+EXTRACT_SKIPPED = []  # 예산 소진 뒤 추출을 건너뛴 href (요약을 저장하지 않으므로 다음 실행에서 다시 추출)
+_EXTRACT_LOCK = threading.Lock()
+_extract_spent = 0.0  # extract_snippet에 실제로 쓴 시간 합계(초, 스레드 합산) — 다운로드·파싱 대기 시간은 제외
+
+# 피드 파싱 결과: url -> {"v": 파서 버전, "h": 본문 해시, "e": parse_feed_entries 결과, "etag"/"lm": 재검증용 검증자}
+# 304이거나 본문이 지난 실행과 같으면 XML 파싱을 건너뜀
+FEED_CACHE = load_json(CACHE_DIR/"feeds.json", {})
+FEED_PARSER_VERSION = 2  # parse_feed_entries 출력이 바뀌면 올림 — 다른 버전의 기록은 무시
+FEED_USED = {}  # 이번 실행에서 받은 피드만 다시 저장 — feeds.yml에서 빠진 URL은 자연히 정리
+
+def save_caches():
+    """기사 기록은 CACHE_DAYS 동안 어느 목록에도 다시 나오지 않으면 버림 — 실행이 쌓여도 크기 유지"""
+    cutoff = RUN_TS - CACHE_DAYS*86400
+    keep = {k: v for k, v in ARTICLE_CACHE.items() if v.get("seen", 0) >= cutoff}
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_if_changed(CACHE_DIR/"articles.json", dump_json(keep))
+    write_if_changed(CACHE_DIR/"feeds.json", dump_json(FEED_USED))
 
 # ===== 수집기 =====
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+
+def _xml_text(el, limit=None) -> str:
+    """요소 텍스트(CDATA·xhtml 포함) → 안전한 텍스트
+    페이지가 innerHTML로 그리므로 feedparser의 sanitizer 대신 태그를 모두 걷어내고 이스케이프"""
+    s = "".join(el.itertext()) if el is not None else ""
+    if "<" in s or "&" in s:  # HTML 조각(type="html", CDATA)이면 텍스트만
+        try:
+            frag = lhtml.fragment_fromstring(s, create_parent="div")
+            for bad in list(frag.iter("script", "style")): bad.drop_tree()
+            s = frag.text_content()
+        except etree.ParserError: s = ""
+    return escape(s[:limit] if limit else s, quote=False)
+
+def _feed_link(el) -> str:
+    """상대·프로토콜 상대 링크는 xml:base(없으면 피드 URL) 기준으로 절대화한 뒤 http(s)만 남김 (javascript: 등은 버림)"""
+    href = (el.text or el.get("href") or "").strip() if el is not None else ""
+    if not href: return ""
+    href = requests.compat.urljoin(el.base or "", href)
+    return href if href.startswith(("http://", "https://")) else ""
+
+def _rss_link(e) -> str:
+    """<link>, 없으면 feedparser처럼 <guid> (isPermaLink="false"만 제외)"""
+    link = _feed_link(e.find("link"))
+    if link: return link
+    g = e.find("guid")
+    return _feed_link(g) if g is not None and g.get("isPermaLink", "true").lower() != "false" else ""
+
+def _utc_tuple(d):
+    if d is None: return None
+    if d.tzinfo is None: d = d.replace(tzinfo=timezone.utc)
+    return d.astimezone(timezone.utc).timetuple()[:6]
+
+def _feed_date(s):
+    """RSS pubDate(RFC 822)는 email.utils로, Atom/dc:date(ISO 8601)는 parse_dt_any로"""
+    if not s: return None
+    try: return _utc_tuple(email.utils.parsedate_to_datetime(s))
+    except (TypeError, ValueError): return _utc_tuple(parse_dt_any(s))
+
+def _parse_feed_lxml(content: bytes, base: str | None = None):
+    """RSS 2.0/Atom 빠른 경로 — 그 외 형식(RSS 1.0 등)이면 None. base: 상대 링크 기준(피드 URL)"""
+    # 파서는 스레드 간 공유하면 안 되므로 호출마다 생성. 외부 엔티티·네트워크 접근은 끔
+    root = etree.fromstring(content, etree.XMLParser(resolve_entities=False, no_network=True), base_url=base)
+    out = []
+    if root.tag == "rss":
+        for e in root.iterfind("channel/item"):
+            out.append((_xml_text(e.find("title")), _rss_link(e),
+                        _xml_text(e.find("description"), 400),
+                        _feed_date(e.findtext("pubDate") or e.findtext(_DC_DATE))))
+    elif root.tag == _ATOM+"feed":
+        for e in root.iterfind(_ATOM+"entry"):
+            link = next((l for l in e.iterfind(_ATOM+"link") if l.get("rel", "alternate") == "alternate"), None)
+            summ = e.find(_ATOM+"summary")
+            out.append((_xml_text(e.find(_ATOM+"title")), _feed_link(link),
+                        _xml_text(summ if summ is not None else e.find(_ATOM+"content"), 400),
+                        _feed_date(e.findtext(_ATOM+"published") or e.findtext(_ATOM+"updated"))))
+    else: return None
+    return out
+
+def parse_feed_entries(content: bytes, base: str | None = None):
+    """피드를 피클 가능한 최소 형태로: [(title, link, summary, (Y,M,D,h,m,s) | None)]
+    잘 만든 RSS 2.0/Atom은 lxml로 바로(텍스트만, 이스케이프), 깨진 XML(HTML 엔티티 등)·기타 형식만 느린 feedparser로(sanitize된 HTML)"""
+    try:
+        out = _parse_feed_lxml(content, base)
+        if out is not None: return out
+    except etree.XMLSyntaxError: pass
+    out=[]
+    for e in feedparser.parse(content, response_headers={"content-location": base or ""}).entries:
+        st=None
+        for key in ["published_parsed","updated_parsed","created_parsed"]:
+            st = getattr(e, key, None)
+            if st: break
+        out.append((e.get("title",""), e.get("link",""),
+                    (e.get("summary") or e.get("description") or "")[:400],
+                    tuple(st[:6]) if st else None))
+    return out
+
 def fetch_rss(url: str):
     try:
-        r = http_get(url, timeout=20); r.raise_for_status()
-        d = feedparser.parse(r.content)
+        rec = FEED_CACHE.get(url) or {}
+        if rec.get("v") != FEED_PARSER_VERSION: rec = {}  # 파서가 바뀌면 예전 결과·검증자는 버리고 새로 받음
+        hdr = {k: v for k, v in (("If-None-Match", rec.get("etag")), ("If-Modified-Since", rec.get("lm"))) if v}
+        with host_slot(url), STREAM_SESSION.get(url, timeout=HTTP_TIMEOUT, headers=hdr, stream=True) as r:  # 본문 수신까지 슬롯 점유
+            if r.status_code == 304: content = None
+            else:
+                r.raise_for_status()
+                content = read_capped(r, MAX_FEED_BYTES)  # 스트리밍 중 cap을 넘으면 바로 끊음
+        if content is None: h, entries = rec["h"], rec["e"]
+        else:
+            h = sha(content)
+            if rec.get("h") == h: entries = rec["e"]  # 검증자 없는 서버도 본문이 같으면 파싱 생략
+            else:
+                entries = PARSE_POOL.submit(parse_feed_entries, content, r.url).result() if PARSE_POOL \
+                          else parse_feed_entries(content, r.url)
+        old = rec if content is None else {}  # 304 응답엔 검증자가 빠질 수 있으므로 이어받음
+        FEED_USED[url] = {"v": FEED_PARSER_VERSION, "h": h, "e": entries, "etag": r.headers.get("ETag") or old.get("etag"),
+                          "lm": r.headers.get("Last-Modified") or old.get("lm")}
         out=[]
-        for e in d.entries:
-            pub=None
-            for key in ["published_parsed","updated_parsed","created_parsed"]:
-                st = getattr(e, key, None)
-                if st: pub=datetime(*st[:6],tzinfo=timezone.utc); break
-            if not pub: pub = now_utc()  # 날짜 없으면 지금으로
+        for title,link,summ,st in entries:
+            pub=datetime(*st,tzinfo=timezone.utc) if st else now_utc()  # 날짜 없으면 지금으로
             if not in_window(pub): continue
-            title=clean_text(e.get("title",""))
-            link=e.get("link","")
-            summ=clean_text((e.get("summary") or e.get("description") or "")[:400])
-            out.append({"title":title,"link":link,"summary":summ,"date":pub.isoformat()})
+            out.append({"title":clean_text(title),"link":link,"summary":clean_text(summ),
+                        "date":pub.isoformat()})
         return out
     except Exception as ex:
         print(f"[WARN][RSS] {url} -> {ex}")
         return []
 
-def fetch_html_window_items(list_url: str, link_pattern: str | None, limit=20):
+def extract_snippet(raw: bytes, limit=320) -> str:
+    """본문 앞부분 발췌. 이미 받은 바이트를 그대로 넘김 — 인코딩 판별은 추출기가 (GBK 페이지도 안전)"""
+    if HTMLTree:
+        tree=HTMLTree.parse_from_bytes(raw,detect_encoding(raw))
+        dl=extract_plain_text(tree,main_content=True,preserve_formatting=False)
+        if dl: return clean_text(dl[:limit])
+    if trafilatura:
+        # 발췌만 필요 — 표/서식/메타데이터(htmldate) 추출은 끔
+        dl=trafilatura.extract(raw,include_comments=False,fast=True,
+                               favor_precision=True,include_tables=False,
+                               include_formatting=False,with_metadata=False,
+                               deduplicate=False) or ""
+        if dl: return clean_text(dl[:limit])
+    return ""
+
+_CHARSET_RX = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([\w-]+)", re.I)
+_CHARSET_ALIAS = {"gb2312": "gb18030", "gbk": "gb18030"}  # WHATWG처럼 상위 집합으로
+
+def _decode_html(r, body: bytes, part: bytes | None = None) -> str:
+    """헤더 charset → <meta charset>(body 앞부분) → UTF-8 순으로 디코드 (requests 기본값 ISO-8859-1로 한자가 깨지지 않게)
+    part: 본문 일부(예: <title> 내용)만 디코드할 때"""
+    if "charset=" in r.headers.get("Content-Type", "").lower(): enc = r.encoding
+    else:
+        m = _CHARSET_RX.search(body[:2048])
+        enc = m.group(1).decode("ascii") if m else "utf-8"
+    enc = _CHARSET_ALIAS.get(enc.lower(), enc)
+    if part is None: part = body
+    try: return part.decode(enc, "replace")
+    except LookupError: return part.decode("utf-8", "replace")
+
+def html_text(r) -> str: return _decode_html(r, r.content)
+
+_TITLE_RX = re.compile(rb"<title[^>]*>(.*?)</title>", re.I | re.S)
+_SHORT_TITLE = 6  # 이보다 짧은 앵커 텍스트("更多", "详情", 빈 문자열)는 제목으로 쓰지 않음
+
+def page_title(r, raw: bytes) -> str:
+    """<title>만 바이트 정규식으로 — HTML 파서·본문 추출 없이 얻는 제목 (r은 charset 판별용 헤더)"""
+    m = _TITLE_RX.search(raw, 0, 65536)
+    return " ".join(unescape(_decode_html(r, raw, m.group(1))).split()) if m else ""
+
+def budgeted_snippet(raw: bytes):
+    """EXTRACT_BUDGET이 남아 있으면 extract_snippet, 소진됐으면 None"""
+    global _extract_spent
+    if _extract_spent >= EXTRACT_BUDGET: return None
+    t0 = time.monotonic()
+    try: return extract_snippet(raw)
+    finally:
+        with _EXTRACT_LOCK: _extract_spent += time.monotonic() - t0
+
+def fetch_detail(href: str, title: str, drop=None):
+    """title: 목록의 앵커 텍스트 — 비었거나 짧으면 href 대신 페이지 <title>로
+    drop: 그렇게 바꾼 제목이 exclude에 걸리면 본문 추출 생략 (항목은 main의 필터에서 빠짐)"""
+    key=sha(href)
+    rec=ARTICLE_CACHE.get(key)
+    if rec:
+        rec["seen"]=RUN_TS
+        pub=datetime.fromisoformat(rec["pub"])
+        if not in_window(pub): return None
+        if not EXTRACT_BODY or "sum" in rec:  # 창 안 기사도 요약까지 저장돼 있으면 상세 GET·본문 추출 생략
+            return {"title":rec.get("title") or title or href,"link":href,
+                    "summary":rec.get("sum","") if EXTRACT_BODY else "","date":pub.isoformat()}
+    try:
+        # 읽기 타임아웃은 recv마다라 조금씩 흘려 보내는 페이지가 워커·호스트 슬롯을 오래 잡지 않게 전체 상한도
+        with host_slot(href), STREAM_SESSION.get(href, timeout=DETAIL_TIMEOUT, stream=True) as art:
+            art.raise_for_status()
+            raw=read_capped(art, MAX_PAGE_BYTES, time.monotonic()+DETAIL_DEADLINE)
+        pub=extract_published_from_html(raw)
+        if pub: ARTICLE_CACHE[key]=rec={"pub":pub.isoformat(),"seen":RUN_TS}  # 추정값(now)은 저장하지 않음
+        else: pub,rec = now_utc(),{}
+        if not in_window(pub): return None
+        dropped=False
+        if len(title)<_SHORT_TITLE:
+            title=rec["title"]=page_title(art,raw) or title
+            dropped=bool(drop and title and drop(title))
+        summary=""
+        if dropped: rec["sum"]=""
+        elif EXTRACT_BODY:
+            try:
+                dl=budgeted_snippet(raw)  # 느린 페이지 몇 개가 실행 시간을 좌우하지 않게
+                if dl is None: EXTRACT_SKIPPED.append(href)
+                else: summary=rec["sum"]=dl
+            except: pass
+        return {"title":title or href,"link":href,"summary":summary,
+                "date":pub.isoformat()}
+    except Exception as ex:
+        print(f"[WARN][HTML:detail] {href} -> {ex}")
+        return None
+
+def parse_anchors(r):
+    """목록 페이지의 [(절대 href, 앵커 텍스트, 노드)] — selectolax(lexbor)가 있으면 lxml보다 빠르고 메모리도 적음"""
+    if LexborHTMLParser:
+        tree = LexborHTMLParser(html_text(r)); b = tree.css_first("base[href]")
+        base = requests.compat.urljoin(r.url, b.attributes.get("href") or "") if b else r.url
+        return [(requests.compat.urljoin(base, a.attributes.get("href") or ""), a.text() or "", a)
+                for a in tree.css("a[href]")]
+    # lxml은 바이트를 직접 받아 인코딩을 판별하고, 절대 URL 변환(<base href> 포함)도 C 쪽에서
+    doc = lhtml.fromstring(r.content)
+    doc.make_links_absolute(r.url, resolve_base_href=True)
+    return [(a.get("href"), a.text_content(), a) for a in doc.iter("a") if a.get("href")]
+
+# 목록 페이지에 이미 보이는 날짜 (URL 경로 /2024-01/15/, /2024/0115/ 또는 <li>…<span>2024-01-15</span>)
+_HREF_DATE_RX = re.compile(r"(?<!\d)(20\d{2})[-/_](\d{2})[-/_]?(\d{2})(?!\d)")
+_TEXT_DATE_RX = re.compile(r"(?<!\d)(20\d{2})[-/.年](\d{1,2})[-/.月](\d{1,2})(?!\d)")
+_LIST_TZ = ZoneInfo("Asia/Shanghai")  # 목록의 날짜는 중국 현지 날짜
+
+def _parent_text(a) -> str:
+    if isinstance(a, etree._Element):
+        p = a.getparent(); return p.text_content() if p is not None else ""
+    p = a.parent; return (p.text() or "") if p is not None else ""
+
+def listed_outside_window(href: str, a) -> bool:
+    """목록만 보고 창 밖임이 확실하면 True (상세 GET 생략). 애매하면 False"""
+    m = _HREF_DATE_RX.search(urlparse(href).path)
+    if not m:
+        ctx = _parent_text(a)
+        # 목록 전체를 감싼 큰 컨테이너면 다른 기사 날짜를 집을 수 있으니 짧고 날짜가 하나일 때만
+        ms = _TEXT_DATE_RX.findall(ctx) if len(ctx) <= 200 else []
+        if len(ms) != 1: return False
+        ymd = ms[0]
+    else: ymd = m.groups()
+    try: start = datetime(*map(int, ymd), tzinfo=_LIST_TZ).timestamp()
+    except ValueError: return False
+    return start + 86400 <= WIN_START_TS or start > WIN_END_TS
+
+def fetch_html_window_items(list_url: str, link_pattern: str | None, claimed: set | None = None,
+                            limit=20, drop=None):
+    """claimed: 소스 간 공유 href 집합 — 다른 목록 페이지가 이미 가져가는 기사는 상세 GET 생략
+      먼저 claim한 스레드가 가져가므로 여러 HTML 목록에 함께 실린 기사의 source는 실행마다 다를 수 있음
+      (RSS와 겹치는 기사는 main에서 feeds.yml 순서대로 정해짐)
+    drop: 앵커 텍스트만으로 어차피 버려질 기사(exclude 키워드)를 거르는 함수 — 상세 GET·본문 추출 생략
+      제목으로 쓰일 만큼 긴 앵커 텍스트에만 적용. 짧은 것은 fetch_detail이 페이지 <title>로 판단"""
     if SKIP_HTML:
         print(f"[INFO] SKIP_HTML=1 skip {list_url}"); return []
     try:
-        r=http_get(list_url,timeout=20); r.raise_for_status()
-        doc=lhtml.fromstring(r.text)
+        with host_slot(list_url):
+            r=http_get(list_url); r.raise_for_status()
+        anchors=parse_anchors(r)
     except Exception as ex:
         print(f"[WARN][HTML:list] {list_url} -> {ex}"); return []
-    rx=re.compile(link_pattern,re.I) if link_pattern else None
-    seen,items=set(),[]
-    for a in doc.xpath("//a[@href]"):
-        href=a.get("href"); 
-        if not href: continue
-        href=requests.compat.urljoin(list_url,href)
-        if rx and not rx.search(href): continue
-        if href in seen: continue
-        seen.add(href)
-        try:
-            art=http_get(href,timeout=20); art.raise_for_status()
-            pub=extract_published_from_html(art.text)
-            if not pub: pub = now_utc()
-            if not in_window(pub): continue
-            title=clean_text(a.text_content()) or href
-            summary=""
-            if EXTRACT_BODY and trafilatura:
-                try:
-                    dl=trafilatura.extract(art.text) or ""
-                    if dl: summary=clean_text(dl[:320])
-                except: pass
-            items.append({"title":title,"link":href,"summary":summary,
-                          "date":pub.isoformat()})
-            if len(items)>=limit: break
-        except Exception as ex:
-            print(f"[WARN][HTML:detail] {href} -> {ex}")
-            continue
+    rx=_compile(link_pattern) if link_pattern else None
+    if claimed is None: claimed=set()
+    def links():
+        # 페이지 안 중복(상단 내비·하단 푸터의 같은 기사)은 정규식 평가 전에 set으로 제외
+        # 제너레이터라 limit이 차면 남은 앵커는 검사·claim 하지 않음 — 다른 목록이 가져갈 수 있게
+        page_seen={r.url}  # 빈 href/자기 자신 링크
+        for href,text,a in anchors:
+            if href in page_seen: continue
+            page_seen.add(href)
+            if rx and not rx.search(href): continue
+            text=clean_text(text)
+            # claim 전에 — 다른 목록의 다른 제목은 살아 있게. 짧은 텍스트는 제목으로 쓰지 않으므로(<title>로 대체) fetch_detail에서
+            if drop and len(text)>=_SHORT_TITLE and drop(text): continue
+            if not claim(claimed,href): continue
+            if listed_outside_window(href,a): continue
+            yield href,text
+    # 상세 페이지는 DETAIL_WORKERS 단위로 병렬 요청, 목록 순서를 유지하며 limit 도달 시 중단
+    # 배치는 남은 자리만큼만 꺼냄 — claim한 기사를 받아 놓고 잘라 버리면 다른 목록도 그 기사를 못 가져감
+    items=[]; it_links=links()
+    while len(items)<limit and (batch:=list(itertools.islice(it_links,min(DETAIL_WORKERS,limit-len(items))))):
+        items.extend(it for it in DETAIL_POOL.map(lambda x: fetch_detail(*x,drop), batch) if it)
     return items
 
 # ===== 메인 =====
 def main():
     feeds=load_yaml(ROOT/"feeds.yml")["feeds"]
     kw=load_yaml(ROOT/"keywords.yml")
-    include=[re.compile(p,re.I) for p in kw.get("include",[])]
-    exclude=[re.compile(p,re.I) for p in kw.get("exclude",[])]
+    include=compile_keywords(tuple(kw.get("include") or ()))
+    exclude=compile_keywords(tuple(kw.get("exclude") or ()))
+
+    if PARSE_POOL: PARSE_POOL.submit(int).result()  # 스레드를 만들기 전에 파싱 워커 프로세스를 먼저 띄움(fork)
+    claimed=set()  # HTML 소스 간 중복 href는 상세 페이지 요청 전에 제외
+    dead=resolve_hosts(f["url"] for f in feeds)
+    for h in sorted(dead): print(f"[WARN][DNS] {h} -> no such host, sources skipped")
+    n_dead=sum(urlparse(f["url"]).hostname in dead for f in feeds)
+    def fetch_source(f):
+        url=f["url"]; typ=f.get("type","rss")
+        if urlparse(url).hostname in dead: return []
+        try:
+            if typ=="rss": return fetch_rss(url)
+            return fetch_html_window_items(url,f.get("link_pattern"),claimed,limit=20,drop=exclude)
+        except Exception as ex:
+            print(f"[WARN][SOURCE] {f['name']} -> {ex}")
+            return []
+
+    # 네트워크 대기는 소스별로 병렬, 필터/중복 제거는 feeds.yml 순서대로 메인 스레드에서
+    with ThreadPoolExecutor(max_workers=FEED_WORKERS) as ex:
+        results=list(ex.map(fetch_source,feeds))
 
     items,seen=[],set()
+    sim_index=[{} for _ in range(_SIM_BANDS)]
     total_candidates=0
 
-    for f in feeds:
-        name=f["name"]; url=f["url"]; typ=f.get("type","rss"); tags=f.get("tags",[])
-        candidates=[]
-        try:
-            if typ=="rss": candidates=fetch_rss(url)
-            else: candidates=fetch_html_window_items(url,f.get("link_pattern"),limit=20)
-        except Exception as ex:
-            print(f"[WARN][SOURCE] {name} -> {ex}")
+    for f,candidates in zip(feeds,results):
+        name=f["name"]; tags=f.get("tags",[])
         total_candidates+=len(candidates)
 
         for it in candidates:
             text=(it["title"]+" "+it.get("summary",""))
-            if include and not any(p.search(text) for p in include): continue
-            if exclude and any(p.search(text) for p in exclude): continue
-            key=sha(it["link"] or it["title"])
-            if key in seen: continue
+            if include and not include(text): continue
+            if exclude and exclude(text): continue
+            key=it["link"] or it["title"]  # 메모리 안 중복 검사는 문자열 그대로 — set이 C에서 해시
+            if key in seen: continue  # 같은 URL은 해밍 검색 전에 바로 제외
             seen.add(key)
+            h=simhash(text)
+            if h is not None and near_dup(sim_index,h): continue  # 다른 출처의 같은 기사
             it.update({"source":name,"tags":tags})
             items.append(it)
 
-    items.sort(key=lambda x:x["date"],reverse=True)
+    items.sort(key=operator.itemgetter("date"),reverse=True)  # date는 모두 UTC isoformat 문자열이라 사전순 = 시간순
 
-    # 산출물 저장
+    # 산출물 저장 — 소스 절반 이상이 DNS로 빠졌으면 거의 빈 페이지로 덮어쓰지 않고 실패로 끝냄(이전 배포 유지)
+    if n_dead*2>len(feeds):
+        save_caches()
+        raise SystemExit(f"[ERROR] {n_dead}/{len(feeds)} sources skipped (DNS) — docs/ not updated")
     DOCS.mkdir(parents=True,exist_ok=True)
-    (DOCS/"data.json").write_text(json.dumps(items,ensure_ascii=False,indent=2),"utf-8")
+    payload=dump_json(items)  # 한 번만 인코딩해 data.json과 HTML 삽입에 같이 씀 (보기용은 python -m json.tool)
+    if not write_if_changed(DOCS/"data.json",payload):
+        print("[INFO] data.json unchanged")
 
-    html=Template(TEMPLATE).render(
+    html=render(TEMPLATE,
         hours=WINDOW_HOURS,
         win_start=WIN_START_LOCAL.strftime("%Y-%m-%d %H:%M"),
         win_end=WIN_END_LOCAL.strftime("%Y-%m-%d %H:%M"),
@@ -230,9 +756,14 @@ def main():
         n_candidates=total_candidates,
         n_final=len(items)
     )
-    html=html.replace("__DATA__",json.dumps(items,ensure_ascii=False))
-    (DOCS/"index.html").write_text(html,"utf-8")
+    head,tail=html.split("__DATA__",1)  # payload를 문자열로 되돌려 끼워 넣지 않고 앞·뒤 조각 사이에 그대로 기록
+    write_if_changed(DOCS/"index.html",head.encode("utf-8"),payload,tail.encode("utf-8"))  # Generated 시각이 들어가므로 사실상 매번 갱신
+
+    # 캐시 저장
+    save_caches()
+    if hasattr(SESSION,"cache"): SESSION.cache.delete(older_than=timedelta(days=CACHE_DAYS))
 
+    if EXTRACT_SKIPPED: print(f"[WARN] EXTRACT_BUDGET {EXTRACT_BUDGET:g}s 소진: 요약 없이 {len(EXTRACT_SKIPPED)}건")
     print(f"[INFO] Sources: {len(feeds)}, candidates={total_candidates}, final={len(items)}")
 
 if __name__=="__main__":